@@ -2,156 +2,227 @@
 Analytics module for trade analysis and data export
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from io import StringIO
 from datetime import datetime
 
+# Bucket edges for the "optimal range" insights in the analysis report
+SCORE_RANGE_EDGES = [0, 30, 50, 70, 100]
+MCAP_RANGE_EDGES = [0, 50000, 200000, 1000000, 10000000]
+
+# Entry characteristics averaged for winning and losing trades
+PROFILE_COLUMNS = ['score', 'market_cap', 'liquidity', 'volume_24h', 'price_change_1h_at_entry']
+
+# Ordered bucket labels for the category columns; the dtypes are built once so each
+# column is just small integer codes pointing into a shared label table
+TRADE_CATEGORY = pd.CategoricalDtype(('Big Loss', 'Loss', 'Win', 'Big Win'), ordered=True)
+HOLD_CATEGORY = pd.CategoricalDtype(('Quick', 'Medium', 'Long'), ordered=True)
+SCORE_CATEGORY = pd.CategoricalDtype(('Low', 'Medium', 'High'), ordered=True)
+
+# Bucket boundaries for those categories: P&L in $, hold time in minutes, token score
+TRADE_PNL_EDGES = np.array([-3, 0, 5])
+HOLD_MINUTES_EDGES = np.array([5, 15])
+SCORE_EDGES = np.array([40, 60])
+
+# Calculated fields and categories, in CSV export order
+DERIVED_COLUMNS = (
+    'profit_margin', 'score_per_dollar', 'volume_to_mcap_ratio', 'liquidity_ratio', 'momentum_score',
+    'trade_category', 'hold_category', 'score_category'
+)
+
+def _raw_df():
+    """Build the trades DataFrame once per trade log version and reuse it across reruns"""
+    version = st.session_state.get('trades_version', 0)
+    cached = st.session_state.get('trades_df_cache')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    df = st.session_state.trade_store.to_frame()
+    # Low-cardinality labels as categoricals so groupby/value_counts hash int codes
+    for column in ('exit_reason', 'source', 'dex'):
+        df[column] = df[column].astype('category')
+    
+    st.session_state.trades_df_cache = (version, df)
+    return df
+
+def _with_derived(df, columns):
+    """Return a copy of `df` with only the requested derived columns added"""
+    wanted = set(columns)
+    derived = {}
+    
+    # Add calculated fields, sharing denominators between the columns that use them and
+    # scaling in place so each expression allocates only its result array
+    if wanted & {'profit_margin', 'score_per_dollar'}:
+        position_size = df['position_size'].to_numpy() + 0.01
+        if 'profit_margin' in wanted:
+            profit_margin = np.divide(df['pnl'].to_numpy(), position_size)
+            profit_margin *= 100
+            derived['profit_margin'] = profit_margin
+        if 'score_per_dollar' in wanted:
+            derived['score_per_dollar'] = df['score'].to_numpy() / position_size
+    if wanted & {'volume_to_mcap_ratio', 'liquidity_ratio'}:
+        market_cap = df['market_cap'].to_numpy() + 1
+        if 'volume_to_mcap_ratio' in wanted:
+            derived['volume_to_mcap_ratio'] = df['volume_24h'].to_numpy() / market_cap
+        if 'liquidity_ratio' in wanted:
+            derived['liquidity_ratio'] = df['liquidity'].to_numpy() / market_cap
+    if 'momentum_score' in wanted:
+        momentum_score = df['price_change_5m_at_entry'].to_numpy() + df['price_change_1h_at_entry'].to_numpy()
+        momentum_score += df['price_change_24h_at_entry'].to_numpy() / 4
+        derived['momentum_score'] = momentum_score
+    
+    # Categorize trades (vectorized bucket lookup instead of per-row lambdas)
+    if 'trade_category' in wanted:
+        derived['trade_category'] = pd.Categorical.from_codes(
+            np.searchsorted(TRADE_PNL_EDGES, df['pnl'].to_numpy()),
+            dtype=TRADE_CATEGORY
+        )
+    if 'hold_category' in wanted:
+        derived['hold_category'] = pd.Categorical.from_codes(
+            np.searchsorted(HOLD_MINUTES_EDGES, df['duration_minutes'].to_numpy(), side='right'),
+            dtype=HOLD_CATEGORY
+        )
+    if 'score_category' in wanted:
+        derived['score_category'] = pd.Categorical.from_codes(
+            np.searchsorted(SCORE_EDGES, df['score'].to_numpy(), side='right'),
+            dtype=SCORE_CATEGORY
+        )
+    
+    return df.assign(**{name: derived[name] for name in DERIVED_COLUMNS if name in wanted})
+
 class Analytics:
     def export_trades_to_csv(self):
         """Export all trade data to CSV for analysis"""
         if not st.session_state.trades:
             return None
         
-        df = pd.DataFrame(st.session_state.trades)
-        
-        # Add calculated fields
-        df['profit_margin'] = df['pnl'] / (df['position_size'] + 0.01) * 100
-        df['score_per_dollar'] = df['score'] / (df['position_size'] + 0.01)
-        df['volume_to_mcap_ratio'] = df['volume_24h'] / (df['market_cap'] + 1)
-        df['liquidity_ratio'] = df['liquidity'] / (df['market_cap'] + 1)
-        df['momentum_score'] = (
-            df['price_change_5m_at_entry'] + 
-            df['price_change_1h_at_entry'] + 
-            (df['price_change_24h_at_entry'] / 4)
-        )
-        
-        # Categorize trades
-        df['trade_category'] = df['pnl'].apply(
-            lambda x: 'Big Win' if x > 5 else 'Win' if x > 0 else 'Loss' if x > -3 else 'Big Loss'
-        )
-        df['hold_category'] = df['duration_minutes'].apply(
-            lambda x: 'Quick' if x < 5 else 'Medium' if x < 15 else 'Long'
-        )
-        df['score_category'] = df['score'].apply(
-            lambda x: 'High' if x >= 60 else 'Medium' if x >= 40 else 'Low'
-        )
-        
-        return df
+        # The export tab renders on every rerun, so keep the full frame per log version
+        version = st.session_state.get('trades_version', 0)
+        cached = st.session_state.get('trades_export_cache')
+        if cached is None or cached[0] != version:
+            cached = (version, _with_derived(_raw_df(), DERIVED_COLUMNS))
+            st.session_state.trades_export_cache = cached
+        return cached[1]
     
     def generate_analysis_report(self):
         """Generate detailed analysis of trading patterns"""
         if not st.session_state.trades or len(st.session_state.trades) < 10:
             return "Need at least 10 trades for meaningful analysis"
         
-        df = self.export_trades_to_csv()
-        analysis = []
+        df = _with_derived(_raw_df(), ['score_category'])
+        analysis = StringIO()
         
-        analysis.append("📊 TRADING PATTERN ANALYSIS\n")
-        analysis.append(f"Total Trades: {len(df)}\n")
-        analysis.append(f"Time Period: {df['timestamp'].min()} to {df['timestamp'].max()}\n\n")
+        analysis.write("📊 TRADING PATTERN ANALYSIS\n")
+        analysis.write(f"Total Trades: {len(df)}\n")
+        analysis.write(f"Time Period: {df['timestamp'].min()} to {df['timestamp'].max()}\n\n")
         
         # Profitability by Score
-        analysis.append("🎯 Profitability by Token Score:\n")
-        score_analysis = df.groupby('score_category')['pnl'].agg(['mean', 'sum', 'count'])
-        analysis.append(score_analysis.to_string() + "\n\n")
-        
-        # Winning trade characteristics
-        analysis.append("✅ Characteristics of Winning Trades:\n")
-        winners = df[df['pnl'] > 0]
-        if len(winners) > 0:
-            analysis.append(f"- Avg Score: {winners['score'].mean():.1f}\n")
-            analysis.append(f"- Avg Market Cap: ${winners['market_cap'].mean():,.0f}\n")
-            analysis.append(f"- Avg Liquidity: ${winners['liquidity'].mean():,.0f}\n")
-            analysis.append(f"- Avg Volume: ${winners['volume_24h'].mean():,.0f}\n")
-            analysis.append(f"- Avg 1h Price Change: {winners['price_change_1h_at_entry'].mean():.1f}%\n\n")
-        
-        # Losing trade characteristics
-        analysis.append("❌ Characteristics of Losing Trades:\n")
-        losers = df[df['pnl'] < 0]
-        if len(losers) > 0:
-            analysis.append(f"- Avg Score: {losers['score'].mean():.1f}\n")
-            analysis.append(f"- Avg Market Cap: ${losers['market_cap'].mean():,.0f}\n")
-            analysis.append(f"- Avg Liquidity: ${losers['liquidity'].mean():,.0f}\n")
-            analysis.append(f"- Avg Volume: ${losers['volume_24h'].mean():,.0f}\n")
-            analysis.append(f"- Avg 1h Price Change: {losers['price_change_1h_at_entry'].mean():.1f}%\n\n")
+        analysis.write("🎯 Profitability by Token Score:\n")
+        score_analysis = df.groupby('score_category', observed=True)['pnl'].agg(['mean', 'sum', 'count'])
+        analysis.write(score_analysis.to_string() + "\n\n")
+        
+        # Winning/losing trade characteristics - every mean from one groupby on the sign of pnl
+        sign_stats = df.groupby(np.sign(df['pnl'].to_numpy()))[PROFILE_COLUMNS].mean()
+        
+        analysis.write("✅ Characteristics of Winning Trades:\n")
+        if 1 in sign_stats.index:
+            self._write_trade_profile(analysis, sign_stats.loc[1])
+        
+        analysis.write("❌ Characteristics of Losing Trades:\n")
+        if -1 in sign_stats.index:
+            self._write_trade_profile(analysis, sign_stats.loc[-1])
         
         # Exit reason analysis
-        analysis.append("🚪 Exit Reason Performance:\n")
-        exit_analysis = df.groupby('exit_reason')['pnl'].agg(['mean', 'sum', 'count'])
-        analysis.append(exit_analysis.to_string() + "\n\n")
+        analysis.write("🚪 Exit Reason Performance:\n")
+        exit_analysis = df.groupby('exit_reason', observed=True)['pnl'].agg(['mean', 'sum', 'count'])
+        analysis.write(exit_analysis.to_string() + "\n\n")
         
         # Time-based patterns
-        analysis.append("⏰ Performance by Hour:\n")
-        hourly_analysis = df.groupby('hour_of_day')['pnl'].agg(['mean', 'sum', 'count'])
-        best_hours = hourly_analysis.nlargest(3, 'mean')
-        analysis.append(f"Best Hours: {best_hours.index.tolist()}\n\n")
+        analysis.write("⏰ Performance by Hour:\n")
+        hours = df['hour_of_day'].to_numpy().astype(np.intp)
+        hourly_sum = np.bincount(hours, weights=df['pnl'].to_numpy(), minlength=24)
+        hourly_count = np.bincount(hours, minlength=24)
+        traded_hours = np.flatnonzero(hourly_count)
+        hourly_mean = hourly_sum[traded_hours] / hourly_count[traded_hours]
+        best_hours = traded_hours[np.argsort(-hourly_mean, kind='stable')[:3]]
+        analysis.write(f"Best Hours: {best_hours.tolist()}\n\n")
         
         # Key insights
-        analysis.append("💡 KEY INSIGHTS:\n")
-        
-        # Find optimal score range
-        score_ranges = [(0, 30), (30, 50), (50, 70), (70, 100)]
-        best_score_range = None
-        best_score_profit = -999
-        
-        for low, high in score_ranges:
-            range_df = df[(df['score'] >= low) & (df['score'] < high)]
-            if len(range_df) > 0:
-                avg_profit = range_df['pnl'].mean()
-                if avg_profit > best_score_profit:
-                    best_score_profit = avg_profit
-                    best_score_range = (low, high)
+        analysis.write("💡 KEY INSIGHTS:\n")
         
+        # Find optimal score and market cap ranges (one groupby per column)
+        best_score_range, best_score_profit = self._best_range(df, 'score', SCORE_RANGE_EDGES)
         if best_score_range:
-            analysis.append(f"- Optimal Score Range: {best_score_range[0]}-{best_score_range[1]} (Avg P&L: ${best_score_profit:.2f})\n")
+            analysis.write(f"- Optimal Score Range: {best_score_range[0]}-{best_score_range[1]} (Avg P&L: ${best_score_profit:.2f})\n")
         
-        # Find optimal market cap range
-        if len(df) > 0:
-            mcap_ranges = [(0, 50000), (50000, 200000), (200000, 1000000), (1000000, 10000000)]
-            best_mcap_range = None
-            best_mcap_profit = -999
-            
-            for low, high in mcap_ranges:
-                range_df = df[(df['market_cap'] >= low) & (df['market_cap'] < high)]
-                if len(range_df) > 0:
-                    avg_profit = range_df['pnl'].mean()
-                    if avg_profit > best_mcap_profit:
-                        best_mcap_profit = avg_profit
-                        best_mcap_range = (low, high)
-            
-            if best_mcap_range:
-                analysis.append(f"- Optimal Market Cap: ${best_mcap_range[0]:,}-${best_mcap_range[1]:,} (Avg P&L: ${best_mcap_profit:.2f})\n")
+        best_mcap_range, best_mcap_profit = self._best_range(df, 'market_cap', MCAP_RANGE_EDGES)
+        if best_mcap_range:
+            analysis.write(f"- Optimal Market Cap: ${best_mcap_range[0]:,}-${best_mcap_range[1]:,} (Avg P&L: ${best_mcap_profit:.2f})\n")
         
         # Correlations
         if len(df) > 5:
-            volume_correlation = df['volume_24h'].corr(df['pnl'])
-            analysis.append(f"- Volume-Profit Correlation: {volume_correlation:.3f}\n")
+            # One correlation matrix so pnl's mean/variance are computed once
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = np.corrcoef(df[['volume_24h', 'liquidity', 'pnl']].to_numpy().T)
+            volume_correlation, liquidity_correlation = corr[0, 2], corr[1, 2]
             
-            liquidity_correlation = df['liquidity'].corr(df['pnl'])
-            analysis.append(f"- Liquidity-Profit Correlation: {liquidity_correlation:.3f}\n")
+            analysis.write(f"- Volume-Profit Correlation: {volume_correlation:.3f}\n")
+            analysis.write(f"- Liquidity-Profit Correlation: {liquidity_correlation:.3f}\n")
         
-        return ''.join(analysis)
+        return analysis.getvalue()
+    
+    def _write_trade_profile(self, analysis, stats):
+        """Write the average entry characteristics for one group of trades"""
+        analysis.write(f"- Avg Score: {stats['score']:.1f}\n")
+        analysis.write(f"- Avg Market Cap: ${stats['market_cap']:,.0f}\n")
+        analysis.write(f"- Avg Liquidity: ${stats['liquidity']:,.0f}\n")
+        analysis.write(f"- Avg Volume: ${stats['volume_24h']:,.0f}\n")
+        analysis.write(f"- Avg 1h Price Change: {stats['price_change_1h_at_entry']:.1f}%\n\n")
+    
+    def _best_range(self, df, column, edges):
+        """Return the (low, high) bucket of `column` with the highest mean P&L"""
+        buckets = pd.cut(df[column].to_numpy(), edges, right=False, labels=False)
+        range_pnl = df['pnl'].groupby(buckets).mean()
+        if range_pnl.empty:
+            return None, 0
+        
+        best = int(range_pnl.idxmax())
+        return (edges[best], edges[best + 1]), range_pnl.max()
     
     def get_performance_metrics(self):
         """Calculate key performance metrics"""
         if not st.session_state.trades:
             return None
         
-        df = pd.DataFrame(st.session_state.trades)
+        # Several panels read these on every rerun, so reduce once per trade log version
+        version = st.session_state.get('trades_version', 0)
+        cached = st.session_state.get('performance_metrics_cache')
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        df = _raw_df()
+        
+        # Build the win/loss masks once and reduce on the raw ndarray
+        pnl = df['pnl'].to_numpy()
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
         
         metrics = {
-            'total_trades': len(df),
-            'winning_trades': len(df[df['pnl'] > 0]),
-            'losing_trades': len(df[df['pnl'] < 0]),
-            'win_rate': len(df[df['pnl'] > 0]) / len(df) * 100 if len(df) > 0 else 0,
-            'avg_win': df[df['pnl'] > 0]['pnl'].mean() if len(df[df['pnl'] > 0]) > 0 else 0,
-            'avg_loss': df[df['pnl'] < 0]['pnl'].mean() if len(df[df['pnl'] < 0]) > 0 else 0,
-            'total_pnl': df['pnl'].sum(),
-            'avg_pnl': df['pnl'].mean(),
-            'best_trade': df['pnl'].max(),
-            'worst_trade': df['pnl'].min(),
-            'avg_duration': df['duration_seconds'].mean() if 'duration_seconds' in df else 0
+            'total_trades': len(pnl),
+            'winning_trades': wins.size,
+            'losing_trades': losses.size,
+            'win_rate': wins.size / pnl.size * 100 if pnl.size > 0 else 0,
+            'avg_win': wins.mean() if wins.size > 0 else 0,
+            'avg_loss': losses.mean() if losses.size > 0 else 0,
+            'total_pnl': pnl.sum(),
+            'avg_pnl': pnl.mean(),
+            'best_trade': pnl.max(),
+            'worst_trade': pnl.min(),
+            'avg_duration': df['duration_seconds'].mean(),
+            'micro_profits': np.count_nonzero((pnl > 0) & (pnl < 1)),
+            'quick_trades': np.count_nonzero(df['duration_seconds'].to_numpy() < 180)
         }
         
         # Profit factor
@@ -160,6 +231,7 @@ class Analytics:
         else:
             metrics['profit_factor'] = 0
         
+        st.session_state.performance_metrics_cache = (version, metrics)
         return metrics
     
     def get_exit_reason_breakdown(self):
@@ -167,7 +239,7 @@ class Analytics:
         if not st.session_state.trades:
             return {}
         
-        df = pd.DataFrame(st.session_state.trades)
+        df = _raw_df()
         return df['exit_reason'].value_counts().to_dict()
     
     def get_source_performance(self):
@@ -175,15 +247,9 @@ class Analytics:
         if not st.session_state.trades:
             return {}
         
-        df = pd.DataFrame(st.session_state.trades)
-        source_perf = {}
-        
-        for source in df['source'].unique():
-            source_df = df[df['source'] == source]
-            source_perf[source] = {
-                'count': len(source_df),
-                'total_pnl': source_df['pnl'].sum(),
-                'avg_pnl': source_df['pnl'].mean()
-            }
+        df = _raw_df()
+        source_perf = df.groupby('source', observed=True, sort=False)['pnl'].agg(
+            count='count', total_pnl='sum', avg_pnl='mean'
+        )
         
-        return source_perf
\ No newline at end of file
+        return source_perf.to_dict('index')
\ No newline at end of file
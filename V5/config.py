@@ -2,6 +2,9 @@
 Micro-Profit High-Frequency Configuration - Optimized for $50/hour on Solana
 """
 
+from dataclasses import dataclass
+from types import MappingProxyType
+
 # High-Frequency Micro-Profit Parameters
 BASE_POSITION_SIZE = 12   # Reduced from 20 to 12 for higher frequency
 MAX_POSITION_SIZE = 20    # Reduced from 40 to 20
@@ -33,36 +36,56 @@ MAX_MARKET_CAP = 5000000       # Higher ceiling
 # Ultra-Fast Timing
 SCAN_INTERVAL = 0.5            # Scan every 500ms
 PRICE_UPDATE_INTERVAL = 0.5    # Update every 500ms
+PRICE_CACHE_TTL = 2.0          # Reuse a fetched price for 2 seconds
+PRICE_CACHE_SIZE = 4096        # Max mints kept in the price cache
+SEARCH_CACHE_TTL = 25           # Serve a search response from memory for 25 seconds
+SEARCH_CACHE_SIZE = 64         # Max search URLs kept, shared by quick/comprehensive/trending scans
 CYCLE_DELAY = 0.1              # 100ms cycles
 SEEN_TOKENS_RESET_TIME = 600   # Reset seen tokens every 10 minutes
+COMPREHENSIVE_SCAN_INTERVAL = 300  # Comprehensive + trending scans every 5 minutes per session
+PNL_HISTORY_LENGTH = 3600      # P&L chart points kept, one per closed trade
+
+# Per-mode trading thresholds - frozen so the hot path reads slots, not dict keys
+@dataclass(frozen=True, slots=True)
+class ModeSettings:
+    MIN_TOKEN_SCORE: int
+    MIN_PRICE_INCREASE: float
+    MIN_MARKET_CAP: int
+    MIN_LIQUIDITY: int
+    MAX_CONCURRENT_POSITIONS: int
+    SCAN_INTERVAL: float
+    NO_CHANGE_SELL_TIME: int
+    TAKE_PROFIT_1: float
+    TAKE_PROFIT_2: float
+    STOP_LOSS: float
 
 # Turbo mode for maximum aggression
-TURBO_SETTINGS = {
-    'MIN_TOKEN_SCORE': 15,           # Extremely low
-    'MIN_PRICE_INCREASE': 0.002,     # 0.2% minimum
-    'MIN_MARKET_CAP': 2000,          # Very low
-    'MIN_LIQUIDITY': 2000,           # Very low
-    'MAX_CONCURRENT_POSITIONS': 300,
-    'SCAN_INTERVAL': 0.3,            # 300ms
-    'NO_CHANGE_SELL_TIME': 10,       # 10 seconds
-    'TAKE_PROFIT_1': 0.02,           # 2% 
-    'TAKE_PROFIT_2': 0.04,           # 4%
-    'STOP_LOSS': 0.02                # 2%
-}
+TURBO_SETTINGS = ModeSettings(
+    MIN_TOKEN_SCORE=15,              # Extremely low
+    MIN_PRICE_INCREASE=0.002,        # 0.2% minimum
+    MIN_MARKET_CAP=2000,             # Very low
+    MIN_LIQUIDITY=2000,              # Very low
+    MAX_CONCURRENT_POSITIONS=300,
+    SCAN_INTERVAL=0.3,               # 300ms
+    NO_CHANGE_SELL_TIME=10,          # 10 seconds
+    TAKE_PROFIT_1=0.02,              # 2% 
+    TAKE_PROFIT_2=0.04,              # 4%
+    STOP_LOSS=0.02                   # 2%
+)
 
-# Normal mode - still aggressive
-NORMAL_SETTINGS = {
-    'MIN_TOKEN_SCORE': 25,
-    'MIN_PRICE_INCREASE': 0.005,
-    'MIN_MARKET_CAP': 5000,
-    'MIN_LIQUIDITY': 5000,
-    'MAX_CONCURRENT_POSITIONS': 200,
-    'SCAN_INTERVAL': 0.5,
-    'NO_CHANGE_SELL_TIME': 15,
-    'TAKE_PROFIT_1': 0.03,
-    'TAKE_PROFIT_2': 0.05,
-    'STOP_LOSS': 0.025
-}
+# Normal mode - still aggressive (the module-level constants above are the single source)
+NORMAL_SETTINGS = ModeSettings(
+    MIN_TOKEN_SCORE=MIN_TOKEN_SCORE,
+    MIN_PRICE_INCREASE=MIN_PRICE_INCREASE,
+    MIN_MARKET_CAP=MIN_MARKET_CAP,
+    MIN_LIQUIDITY=MIN_LIQUIDITY,
+    MAX_CONCURRENT_POSITIONS=MAX_CONCURRENT_POSITIONS,
+    SCAN_INTERVAL=SCAN_INTERVAL,
+    NO_CHANGE_SELL_TIME=NO_CHANGE_SELL_TIME,
+    TAKE_PROFIT_1=TAKE_PROFIT_1,
+    TAKE_PROFIT_2=TAKE_PROFIT_2,
+    STOP_LOSS=STOP_LOSS
+)
 
 # API Configuration
 API_HEADERS = {
@@ -73,6 +96,11 @@ API_HEADERS = {
     'Pragma': 'no-cache'
 }
 
+# Stop calling DexScreener for a while once it keeps failing, instead of paying every timeout
+CIRCUIT_FAILURE_LIMIT = 5      # Failures tolerated...
+CIRCUIT_FAILURE_WINDOW = 30    # ...within 30 seconds
+CIRCUIT_COOLDOWN = 60          # Skip requests for 60 seconds once tripped
+
 # Massively expanded search for maximum discovery
 SEARCH_QUERIES = [
     # Core Solana
@@ -96,32 +124,32 @@ SEARCH_QUERIES = [
 ]
 
 # Extremely permissive quality filters
-QUALITY_FILTERS = {
+QUALITY_FILTERS = MappingProxyType({
     'MIN_VOLUME_TO_MCAP_RATIO': 1.0,    # Very low
     'MIN_MOMENTUM_SCORE': 0.0,          # Accept any momentum
     'MAX_AGE_HOURS': 720,               # 30 days
     'MIN_HOLDER_COUNT': 10,             # Very low
     'MAX_TOP_HOLDER_PERCENT': 60,       # Very permissive
-}
+})
 
 # Aggressive risk settings
-RISK_SETTINGS = {
+RISK_SETTINGS = MappingProxyType({
     'MAX_DAILY_TRADES': 500,            # Very high
     'MAX_EQUITY_PER_TRADE': 0.15,       # 15% max
     'STOP_TRADING_WIN_STREAK': False,
     'STOP_TRADING_LOSS_STREAK': 15,     # High tolerance
     'DAILY_PROFIT_TARGET': 50,
     'TAKE_BREAK_AFTER_TARGET': False,
-}
+})
 
 # Network optimized for Solana speed
-NETWORK_PRIORITY = {
+NETWORK_PRIORITY = MappingProxyType({
     'solana': 1,      # Highest priority
     'base': 2,        # Secondary
     'arbitrum': 3,    # Tertiary
     'polygon': 4,     # Quaternary
     'ethereum': 5     # Lowest (too expensive)
-}
+})
 
 # Profit target calculation for $50/hour
 # At $0.50 avg profit per trade, need 100 trades/hour
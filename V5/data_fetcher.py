@@ -2,35 +2,135 @@
 High-Frequency Data Fetcher - Optimized for maximum token discovery and speed
 """
 
+import heapq
+import numpy as np
+import re
 import requests
-import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from operator import attrgetter
 from datetime import datetime, timedelta
 from config import *
 
+# orjson decodes the multi-KB search responses considerably faster; fall back to stdlib json
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Minimal suspicious word filtering for speed - one compiled scan instead of a substring loop
+SUSPICIOUS_SYMBOL_RE = re.compile(r'TEST|FAKE|SCAM')
+
+# Query lists are fixed for the process, so slice them once at import
+COMPREHENSIVE_QUERIES = tuple(SEARCH_QUERIES[:20])  # Use first 20 for speed
+TRENDING_QUERIES = ("trending", "volume")           # "hot" and "new" left out for speed
+
+# Score bands as (ascending edges, points): a value strictly above k edges earns points[k]
+VOLUME_BANDS = (np.array([100, 1000, 10000, 50000, 200000]), np.array([0, 5, 10, 15, 20, 30]))
+MOMENTUM_5M_BANDS = (np.array([-2, 0, 0.5, 2, 5]), np.array([0, 5, 10, 15, 20, 25]))
+MOMENTUM_1H_BANDS = (np.array([-5, 0, 5, 10]), np.array([0, 5, 10, 15, 20]))
+LIQUIDITY_BANDS = (np.array([5000, 10000, 20000, 50000]), np.array([0, 5, 10, 15, 20]))
+TXNS_BANDS = (np.array([10, 50, 100]), np.array([0, 5, 8, 10]))
+VOLATILITY_BANDS = (np.array([8, 15]), np.array([0, 5, 10]))
+
+def _band_points(values, bands):
+    """Look up every value's band with one binary search instead of an if/elif ladder"""
+    edges, points = bands
+    return points[np.searchsorted(edges, values)]
+
+def _fnum(value):
+    """DexScreener sends numbers as floats, ints or strings; floats pass through untouched and empties become 0"""
+    return value if type(value) is float else (float(value) if value else 0.0)
+
+# Pair keys the scans actually read; cached search responses keep only these (drops info/websites/socials etc.)
+PAIR_FIELDS = (
+    'chainId', 'dexId', 'baseToken', 'priceUsd', 'fdv', 'marketCap',
+    'liquidity', 'volume', 'priceChange', 'txns', 'pairCreatedAt'
+)
+
+# Token fields read by the tradeable filter and the speed-optimized score
+SCORE_FIELDS = ('market_cap', 'liquidity', 'volume_24h', 'price_change_5m', 'price_change_1h', 'txns_24h')
+
+# One parsed DexScreener pair - slotted, so hundreds per scan stay small and fields are plain attribute reads
+@dataclass(slots=True)
+class TokenRecord:
+    mint: str
+    symbol: str
+    name: str
+    price_usd: float
+    market_cap: float
+    liquidity: float
+    volume_24h: float
+    price_change_5m: float
+    price_change_1h: float
+    price_change_24h: float
+    txns_24h: int
+    source: str
+    dex: str
+    pair_created_at: int
+    score: int = 0
+
 class HighFrequencyDataFetcher:
     def __init__(self):
         self.headers = API_HEADERS
-        self.last_comprehensive_scan = 0
-        self.quick_scan_queries = ["pump", "new", "SOL", "bonk", "pepe"]  # Fast rotation
+        
+        # One keep-alive session for every DexScreener call so repeat requests skip the TCP/TLS handshake
+        self.session = requests.Session()
+        self.session.headers.update(API_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            # Retry-After is not honoured: a long rate-limit wait would stall the scan thread;
+            # repeated 429s trip the circuit breaker below instead. Only status codes are retried -
+            # a connect or read timeout fails at once so a call never blocks past its own timeout
+            max_retries=Retry(
+                total=2,
+                connect=0,
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=('GET',),
+                respect_retry_after_header=False,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        
+        # Searches are pure network waits, so fan them out over the session's connection pool
+        self.executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix='dexscreener')
+        
+        # mint -> (fetched_at, price), oldest first so the size bound evicts stale entries
+        self.price_cache = OrderedDict()
+        # search url -> (fetched_at, pairs, validators), shared by every scan tier; least recently used first
+        self.search_cache = OrderedDict()
+        
+        # Circuit breaker state for the DexScreener host
+        self.failure_count = 0
+        self.first_failure_at = 0
+        self.circuit_open_until = 0
+        
+        # Scan scheduling belongs to each caller's session; the fetcher itself is shared
+        self.quick_scan_queries = ("pump", "new", "SOL", "bonk", "pepe")  # Fast rotation
         
     def fetch_quick_scan_tokens(self):
         """Ultra-fast scan with rotating queries"""
         tokens = []
-        current_time = time.time()
         
-        # Rotate through quick scan queries every 30 seconds
-        query_index = int(current_time / 30) % len(self.quick_scan_queries)
-        query = self.quick_scan_queries[query_index]
+        # Rotate through quick scan queries every 30 seconds - derived from the clock alone, so
+        # every session sharing this fetcher sees the same query without any shared mutable state
+        query = self.quick_scan_queries[int(time.monotonic() // 30) % len(self.quick_scan_queries)]
         
         try:
-            url = f"https://api.dexscreener.com/latest/dex/search?q={query}"
-            response = requests.get(url, headers=self.headers, timeout=2)  # Very short timeout
+            # Very short timeout; quick picks feed entries directly, so their search data is held
+            # no longer than a cached price rather than the comprehensive tiers' longer TTL
+            pairs = self._search_pairs(query, timeout=2, ttl_seconds=PRICE_CACHE_TTL)
             
-            if response.status_code == 200:
-                data = response.json()
-                pairs = data.get('pairs', [])
-                
+            if pairs is not None:
                 # Process more pairs quickly
                 for pair in pairs[:40]:
                     if pair.get('chainId') != 'solana':
@@ -45,60 +145,133 @@ class HighFrequencyDataFetcher:
         
         return tokens
     
+    def _get(self, url, timeout, headers=None):
+        """GET through the pooled session; returns None without a request while the circuit is open"""
+        now = time.time()
+        if now < self.circuit_open_until:
+            return None
+        
+        try:
+            response = self.session.get(url, timeout=timeout, headers=headers)
+        except requests.RequestException:
+            self._record_failure(now)
+            raise
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            self._record_failure(now)
+        else:
+            self.failure_count = 0
+        return response
+    
+    def _record_failure(self, now):
+        if self.failure_count == 0 or now - self.first_failure_at > CIRCUIT_FAILURE_WINDOW:
+            self.failure_count = 0
+            self.first_failure_at = now
+        
+        self.failure_count += 1
+        if self.failure_count > CIRCUIT_FAILURE_LIMIT:
+            self.circuit_open_until = now + CIRCUIT_COOLDOWN
+            self.failure_count = 0
+    
+    def _search_pairs(self, query, timeout, ttl_seconds=SEARCH_CACHE_TTL):
+        """Run one DexScreener search, returning its pairs or None on a non-200 response"""
+        url = f"https://api.dexscreener.com/latest/dex/search?q={query}"
+        now = time.time()
+        
+        # Recent responses are reused outright; older ones are revalidated with their ETag/Last-Modified
+        cached = self.search_cache.get(url)
+        if cached is not None and now - cached[0] < ttl_seconds:
+            self.search_cache.move_to_end(url)
+            return cached[1]
+        
+        headers = cached[2] if cached is not None and cached[2] else None
+        response = self._get(url, timeout, headers)
+        if response is None:
+            return None
+        
+        if response.status_code == 304 and cached is not None:
+            self._cache_search(url, now, cached[1], cached[2])
+            return cached[1]
+        
+        if response.status_code != 200:
+            return None
+        
+        # Every scan tier only keeps Solana pairs, so a body that never mentions the chain needs no parse
+        if b'"solana"' in response.content:
+            pairs = [
+                {key: pair[key] for key in PAIR_FIELDS if key in pair}
+                for pair in json_loads(response.content).get('pairs') or []
+            ]
+        else:
+            pairs = []
+        validators = {}
+        if 'ETag' in response.headers:
+            validators['If-None-Match'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        self._cache_search(url, now, pairs, validators)
+        return pairs
+    
+    def _cache_search(self, url, fetched_at, pairs, validators):
+        self.search_cache[url] = (fetched_at, pairs, validators)
+        self.search_cache.move_to_end(url)
+        if len(self.search_cache) > SEARCH_CACHE_SIZE:
+            self.search_cache.popitem(last=False)
+    
     def fetch_comprehensive_scan_tokens(self):
         """Comprehensive scan every 5 minutes"""
         tokens = []
         
-        # Use many search queries for maximum discovery
-        search_queries = SEARCH_QUERIES[:20]  # Use first 20 for speed
-        
-        for query in search_queries:
+        def scan_query(query):
+            query_tokens = []
             try:
-                url = f"https://api.dexscreener.com/latest/dex/search?q={query}"
-                response = requests.get(url, headers=self.headers, timeout=3)
+                pairs = self._search_pairs(query, timeout=3)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    pairs = data.get('pairs', [])
-                    
+                if pairs is not None:
                     for pair in pairs[:25]:  # Take more pairs
                         if pair.get('chainId') != 'solana':
                             continue
                         
                         token_data = self._parse_dexscreener_pair(pair)
                         if token_data and self._passes_volume_filter(token_data):
-                            tokens.append(token_data)
+                            query_tokens.append(token_data)
                             
             except Exception as e:
                 print(f"Comprehensive scan failed for {query}: {str(e)[:30]}")
-                continue
+            
+            return query_tokens
+        
+        # Many search queries for maximum discovery, all in flight at once; results are collected in query order
+        for query_tokens in self.executor.map(scan_query, COMPREHENSIVE_QUERIES):
+            tokens.extend(query_tokens)
         
         return tokens
     
     def fetch_trending_tokens(self):
         """Fetch by volume/activity sorting"""
+        # Try different trending approaches
+        return self._collect_trending_tokens(self._submit_trending_searches())
+    
+    def _submit_trending_searches(self):
+        return [self.executor.submit(self._search_pairs, query, 2) for query in TRENDING_QUERIES]
+    
+    def _collect_trending_tokens(self, searches):
+        """Turn the trending search futures into tokens; call from outside the pool, never from a worker"""
         tokens = []
         
         try:
-            # Try different trending approaches
-            trending_queries = ["trending", "volume", "hot", "new"]
-            
-            for query in trending_queries[:2]:  # Limit for speed
-                url = f"https://api.dexscreener.com/latest/dex/search?q={query}"
-                response = requests.get(url, headers=self.headers, timeout=2)
+            for search in searches:
+                pairs = search.result()
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    pairs = data.get('pairs', [])
-                    
-                    # Sort by volume and take top performers
-                    volume_sorted = sorted(
-                        [p for p in pairs if p.get('chainId') == 'solana'], 
-                        key=lambda x: float(x.get('volume', {}).get('h24', 0) or 0), 
-                        reverse=True
+                if pairs is not None:
+                    # Take the top performers by volume without sorting every pair
+                    top_by_volume = heapq.nlargest(
+                        20,
+                        (p for p in pairs if p.get('chainId') == 'solana'), 
+                        key=lambda x: _fnum(x.get('volume', {}).get('h24'))
                     )
                     
-                    for pair in volume_sorted[:20]:
+                    for pair in top_by_volume:
                         token_data = self._parse_dexscreener_pair(pair)
                         if token_data and self._passes_volume_filter(token_data):
                             tokens.append(token_data)
@@ -108,69 +281,69 @@ class HighFrequencyDataFetcher:
         
         return tokens
     
-    def fetch_all_tokens(self):
-        """Adaptive fetching strategy based on timing"""
-        st.session_state.api_calls_count += 1
-        current_time = time.time()
-        
-        all_tokens = []
-        
-        # Always do quick scan for immediate opportunities
-        quick_tokens = self.fetch_quick_scan_tokens()
-        all_tokens.extend(quick_tokens)
-        
-        # Comprehensive scan every 5 minutes
-        if current_time - self.last_comprehensive_scan >= 300:  # 5 minutes
-            self.last_comprehensive_scan = current_time
-            
-            comprehensive_tokens = self.fetch_comprehensive_scan_tokens()
-            all_tokens.extend(comprehensive_tokens)
-            
-            trending_tokens = self.fetch_trending_tokens()
-            all_tokens.extend(trending_tokens)
-        
-        # Remove duplicates efficiently
+    def fetch_all_tokens(self, turbo_mode=False, comprehensive=False):
+        """Adaptive fetching strategy based on the caller's trading mode and scan schedule"""
+        # Comprehensive and trending scans when the caller's schedule says one is due
+        if comprehensive:
+            # All three tiers hit the same host, so the quick scan and trending searches run on the
+            # pool while this thread drives the comprehensive queries; scans keep their tier order.
+            # Only this thread waits on pool tasks - a worker waiting on the pool could deadlock it
+            quick = self.executor.submit(self.fetch_quick_scan_tokens)
+            trending_searches = self._submit_trending_searches()
+            comprehensive = self.fetch_comprehensive_scan_tokens()
+            scans = [quick.result(), comprehensive, self._collect_trending_tokens(trending_searches)]
+        else:
+            # Always do quick scan for immediate opportunities
+            scans = [self.fetch_quick_scan_tokens()]
+        
+        # Remove duplicates efficiently, streaming straight from each scan's list
         unique_tokens = {}
-        for token in all_tokens:
-            mint = token.get('mint', '')
-            if mint:
-                # Take token with highest volume if duplicate
-                if mint not in unique_tokens or token.get('volume_24h', 0) > unique_tokens[mint].get('volume_24h', 0):
-                    unique_tokens[mint] = token
-        
-        # Score and filter with very permissive criteria
-        quality_tokens = []
-        for token in unique_tokens.values():
-            if self.is_high_frequency_tradeable(token):
-                score = self.calculate_speed_optimized_score(token)
-                token['score'] = score
-                
-                # Very low score requirements for high frequency
-                min_score = 25 if not st.session_state.turbo_mode else 15
-                if score >= min_score:
-                    quality_tokens.append(token)
+        for token in chain.from_iterable(scans):
+            mint = token.mint
+            if not mint:
+                continue
+            
+            # Take token with highest volume if duplicate
+            current = unique_tokens.get(mint)
+            if current is None or token.volume_24h > current.volume_24h:
+                unique_tokens[mint] = token
+        
+        # Score and filter with very permissive criteria, one column per field across all tokens.
+        # Each token is visited once: attrgetter pulls all scoring fields as a tuple in C.
+        candidates = list(unique_tokens.values())
+        rows = np.array(list(map(attrgetter(*SCORE_FIELDS), candidates)), dtype=np.float64).reshape(-1, len(SCORE_FIELDS))
+        columns = dict(zip(SCORE_FIELDS, rows.T))
+        scores = self.calculate_speed_optimized_scores(columns)
+        
+        # Very low score requirements for high frequency
+        min_score = 25 if not turbo_mode else 15
+        quality = np.flatnonzero(self.high_frequency_tradeable_mask(columns) & (scores >= min_score))
         
         # Sort by score and recent activity
-        quality_tokens.sort(key=lambda x: (
-            x.get('score', 0) + 
-            x.get('volume_24h', 0) / 50000 +  # Volume bonus
-            x.get('price_change_5m', 0)  # Recent momentum bonus
-        ), reverse=True)
+        sort_key = (
+            scores[quality] + 
+            columns['volume_24h'][quality] / 50000 +  # Volume bonus
+            columns['price_change_5m'][quality]  # Recent momentum bonus
+        )
+        ranked = quality[np.argsort(-sort_key, kind='stable')]
         
         # Take many tokens for high frequency
-        max_tokens = 100 if not st.session_state.turbo_mode else 150
-        final_tokens = quality_tokens[:max_tokens]
+        max_tokens = 100 if not turbo_mode else 150
+        final_tokens = []
+        for i in ranked[:max_tokens]:
+            token = candidates[i]
+            token.score = int(scores[i])
+            final_tokens.append(token)
         
-        st.session_state.tokens_found = len(final_tokens)
         return final_tokens
     
     def _passes_quick_filter(self, token_data):
         """Ultra-permissive quick filter"""
-        if not token_data or token_data['price_usd'] <= 0:
+        if not token_data or token_data.price_usd <= 0:
             return False
         
-        market_cap = token_data.get('market_cap', 0)
-        liquidity = token_data.get('liquidity', 0)
+        market_cap = token_data.market_cap
+        liquidity = token_data.liquidity
         
         # Very basic checks only
         if market_cap < 1000 or market_cap > 10000000:  # Very wide range
@@ -183,12 +356,12 @@ class HighFrequencyDataFetcher:
     
     def _passes_volume_filter(self, token_data):
         """Slightly more restrictive but still permissive"""
-        if not token_data or token_data['price_usd'] <= 0:
+        if not token_data or token_data.price_usd <= 0:
             return False
         
-        market_cap = token_data.get('market_cap', 0)
-        liquidity = token_data.get('liquidity', 0)
-        volume_24h = token_data.get('volume_24h', 0)
+        market_cap = token_data.market_cap
+        liquidity = token_data.liquidity
+        volume_24h = token_data.volume_24h
         
         if market_cap < MIN_MARKET_CAP or market_cap > MAX_MARKET_CAP:
             return False
@@ -201,209 +374,210 @@ class HighFrequencyDataFetcher:
         
         return True
     
-    def is_high_frequency_tradeable(self, token):
-        """Extremely permissive quality check for high-frequency trading"""
-        market_cap = token.get('market_cap', 0)
-        liquidity = token.get('liquidity', 0)
-        volume = token.get('volume_24h', 0)
-        price_change_1h = token.get('price_change_1h', 0)
-        
-        # Very wide market cap range
-        if not (5000 <= market_cap <= 5000000):
-            return False
-        
-        # Low liquidity requirement
-        if liquidity < 5000:
-            return False
-        
-        # Accept almost any volume activity
-        if volume < 100:
-            return False
-        
-        # Very permissive momentum - only reject extreme negatives
-        if price_change_1h < -20:  # Only reject >20% drops in 1h
-            return False
-        
-        # Basic activity check
-        if token.get('txns_24h', 0) < 5:  # Very low transaction requirement
-            return False
-        
-        return True
+    def high_frequency_tradeable_mask(self, columns):
+        """Extremely permissive quality check for high-frequency trading, for every token at once"""
+        market_cap = columns['market_cap']
+        
+        return (
+            # Very wide market cap range
+            (5000 <= market_cap) & (market_cap <= 5000000) &
+            # Low liquidity requirement
+            (columns['liquidity'] >= 5000) &
+            # Accept almost any volume activity
+            (columns['volume_24h'] >= 100) &
+            # Very permissive momentum - only reject >20% drops in 1h
+            (columns['price_change_1h'] >= -20) &
+            # Basic activity check - very low transaction requirement
+            (columns['txns_24h'] >= 5)
+        )
     
-    def calculate_speed_optimized_score(self, token):
-        """Fast scoring optimized for high-frequency discovery"""
-        score = 0
-        
-        volume = token.get('volume_24h', 0)
-        liquidity = token.get('liquidity', 0)
-        market_cap = token.get('market_cap', 0)
-        price_change_5m = token.get('price_change_5m', 0)
-        price_change_1h = token.get('price_change_1h', 0)
-        txns_24h = token.get('txns_24h', 0)
+    def calculate_speed_optimized_scores(self, columns):
+        """Fast scoring optimized for high-frequency discovery, vectorized over all tokens"""
+        volume = columns['volume_24h']
+        liquidity = columns['liquidity']
+        market_cap = columns['market_cap']
+        price_change_5m = columns['price_change_5m']
+        price_change_1h = columns['price_change_1h']
+        txns_24h = columns['txns_24h']
         
         # Heavy emphasis on recent activity and volume
-        if volume > 200000:
-            score += 30
-        elif volume > 50000:
-            score += 20
-        elif volume > 10000:
-            score += 15
-        elif volume > 1000:
-            score += 10
-        elif volume > 100:
-            score += 5
-        
-        # Recent momentum scoring (most important for high-frequency)
-        if price_change_5m > 5:
-            score += 25
-        elif price_change_5m > 2:
-            score += 20
-        elif price_change_5m > 0.5:
-            score += 15
-        elif price_change_5m > 0:
-            score += 10
-        elif price_change_5m > -2:  # Small negative OK
-            score += 5
+        score = _band_points(volume, VOLUME_BANDS)
+        
+        # Recent momentum scoring (most important for high-frequency); small negative OK
+        score += _band_points(price_change_5m, MOMENTUM_5M_BANDS)
         
         # Medium-term momentum
-        if price_change_1h > 10:
-            score += 20
-        elif price_change_1h > 5:
-            score += 15
-        elif price_change_1h > 0:
-            score += 10
-        elif price_change_1h > -5:  # Small negative OK
-            score += 5
+        score += _band_points(price_change_1h, MOMENTUM_1H_BANDS)
         
         # Liquidity scoring
-        if liquidity > 50000:
-            score += 20
-        elif liquidity > 20000:
-            score += 15
-        elif liquidity > 10000:
-            score += 10
-        elif liquidity > 5000:
-            score += 5
-        
-        # Market cap scoring - prefer smaller caps for volatility
-        if 10000 <= market_cap <= 200000:
-            score += 15  # Sweet spot for micro-cap volatility
-        elif 5000 <= market_cap <= 500000:
-            score += 12
-        elif market_cap <= 1000000:
-            score += 8
+        score += _band_points(liquidity, LIQUIDITY_BANDS)
+        
+        # Market cap scoring - prefer smaller caps for volatility (10k-200k is the micro-cap sweet spot);
+        # overlapping inclusive ranges rather than a ladder, so this one stays a select
+        score += np.select(
+            [
+                (10000 <= market_cap) & (market_cap <= 200000),
+                (5000 <= market_cap) & (market_cap <= 500000),
+                market_cap <= 1000000
+            ],
+            [15, 12, 8]
+        )
         
         # Transaction activity
-        if txns_24h > 100:
-            score += 10
-        elif txns_24h > 50:
-            score += 8
-        elif txns_24h > 10:
-            score += 5
+        score += _band_points(txns_24h, TXNS_BANDS)
         
         # Volatility bonus - high-frequency trading benefits from movement
-        if abs(price_change_1h) > 15:  # Any big movement
-            score += 10
-        elif abs(price_change_1h) > 8:
-            score += 5
+        score += _band_points(np.abs(price_change_1h), VOLATILITY_BANDS)
         
         # Recent activity bonus
-        if price_change_5m > 0 and volume > 5000:
-            score += 8
+        score += np.where((price_change_5m > 0) & (volume > 5000), 8, 0)
         
-        return max(0, score)
+        return np.maximum(score, 0)
     
     def _parse_dexscreener_pair(self, pair):
-        """Fast parsing with minimal validation"""
+        """Fast parsing with minimal validation - each nested block is read once, missing fields count as 0"""
         try:
             base_token = pair.get('baseToken', {})
             
             symbol = base_token.get('symbol', 'UNKNOWN').upper()
             
-            # Minimal suspicious word filtering for speed
-            if any(word in symbol for word in ['TEST', 'FAKE', 'SCAM']):
+            if SUSPICIOUS_SYMBOL_RE.search(symbol):
                 return None
             
-            token_data = {
-                'mint': base_token.get('address', ''),
-                'symbol': symbol,
-                'name': base_token.get('name', 'Unknown'),
-                'price_usd': float(pair.get('priceUsd', 0) or 0),
-                'market_cap': float(pair.get('fdv', 0) or pair.get('marketCap', 0) or 0),
-                'liquidity': self._extract_liquidity(pair),
-                'volume_24h': self._extract_volume(pair),
-                'price_change_5m': self._extract_price_change(pair, 'm5'),
-                'price_change_1h': self._extract_price_change(pair, 'h1'),
-                'price_change_24h': self._extract_price_change(pair, 'h24'),
-                'txns_24h': self._extract_transactions(pair),
-                'source': 'DexScreener',
-                'dex': pair.get('dexId', 'unknown'),
-                'pair_created_at': pair.get('pairCreatedAt', 0)
-            }
+            liquidity = pair.get('liquidity')
+            if isinstance(liquidity, dict):
+                liquidity = liquidity.get('usd', 0)
+            
+            volume = pair.get('volume')
+            price_change = pair.get('priceChange')
+            if not isinstance(price_change, dict):
+                price_change = {}
+            
+            txns_24h = 0
+            txns = pair.get('txns')
+            if isinstance(txns, dict):
+                h24_data = txns.get('h24')
+                if isinstance(h24_data, dict):
+                    txns_24h = int((h24_data.get('buys', 0) or 0) + (h24_data.get('sells', 0) or 0))
+            
+            token_data = TokenRecord(
+                mint=base_token.get('address', ''),
+                symbol=symbol,
+                name=base_token.get('name', 'Unknown'),
+                price_usd=_fnum(pair.get('priceUsd')),
+                market_cap=_fnum(pair.get('fdv') or pair.get('marketCap')),
+                liquidity=_fnum(liquidity),
+                volume_24h=_fnum(volume.get('h24')) if isinstance(volume, dict) else 0.0,
+                price_change_5m=_fnum(price_change.get('m5')),
+                price_change_1h=_fnum(price_change.get('h1')),
+                price_change_24h=_fnum(price_change.get('h24')),
+                txns_24h=txns_24h,
+                source='DexScreener',
+                dex=pair.get('dexId', 'unknown'),
+                pair_created_at=pair.get('pairCreatedAt', 0)
+            )
             
             return token_data
         except:
             return None
     
-    def _extract_liquidity(self, pair):
-        try:
-            if 'liquidity' in pair:
-                if isinstance(pair['liquidity'], dict):
-                    return float(pair['liquidity'].get('usd', 0) or 0)
-                else:
-                    return float(pair['liquidity'] or 0)
-        except:
-            return 0
-    
-    def _extract_volume(self, pair):
-        try:
-            if 'volume' in pair:
-                if isinstance(pair['volume'], dict):
-                    return float(pair['volume'].get('h24', 0) or 0)
-        except:
-            return 0
-    
-    def _extract_price_change(self, pair, timeframe):
-        try:
-            if 'priceChange' in pair:
-                if isinstance(pair['priceChange'], dict):
-                    return float(pair['priceChange'].get(timeframe, 0) or 0)
-        except:
-            return 0
-    
-    def _extract_transactions(self, pair):
-        try:
-            if 'txns' in pair and isinstance(pair['txns'], dict):
-                h24_data = pair['txns'].get('h24', {})
-                if isinstance(h24_data, dict):
-                    buys = h24_data.get('buys', 0)
-                    sells = h24_data.get('sells', 0)
-                    return int(buys + sells)
-        except:
-            return 0
-    
     def get_current_price(self, token):
-        """Fast price fetching with fallback"""
+        """Fast price fetching with a short-lived cache and fallback"""
         try:
-            mint = token.get('mint', '')
+            mint = token.mint
             if mint and len(mint) > 20:
+                now = time.time()
+                cached = self.price_cache.get(mint)
+                if cached is not None and now - cached[0] < PRICE_CACHE_TTL:
+                    return cached[1]
+                
                 url = f"https://api.dexscreener.com/latest/dex/tokens/{mint}"
-                response = requests.get(url, headers=self.headers, timeout=1)  # Very fast timeout
+                response = self._get(url, timeout=1)  # Very fast timeout
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if response is not None and response.status_code == 200:
+                    data = json_loads(response.content)
                     pairs = data.get('pairs', [])
                     
                     if pairs:
-                        best_pair = max(pairs, key=lambda p: float(p.get('liquidity', {}).get('usd', 0) or 0))
-                        price = float(best_pair.get('priceUsd', 0) or 0)
+                        best_pair = max(pairs, key=lambda p: _fnum(p.get('liquidity', {}).get('usd')))
+                        price = _fnum(best_pair.get('priceUsd'))
                         if price > 0:
+                            self._cache_price(mint, now, price)
                             return price
         except:
             pass
         
         # Return last known price if API fails
-        return token.get('price_usd', 0)
+        return token.price_usd
+    
+    def get_current_prices(self, tokens):
+        """Batch price fetching for many tokens; returns {mint: price} with the same cache and fallback"""
+        now = time.time()
+        prices = {}
+        stale_mints = {}
+        
+        for token in tokens:
+            mint = token.mint
+            cached = self.price_cache.get(mint)
+            if cached is not None and now - cached[0] < PRICE_CACHE_TTL:
+                prices[mint] = cached[1]
+            elif mint and len(mint) > 20:
+                stale_mints[mint] = None
+        
+        # DexScreener accepts up to 30 comma-separated mints per tokens request
+        stale_mints = list(stale_mints)
+        batches = [stale_mints[i:i + 30] for i in range(0, len(stale_mints), 30)]
+        for batch_prices in self.executor.map(self._fetch_price_batch, batches):
+            for mint, price in batch_prices.items():
+                self._cache_price(mint, now, price)
+                prices[mint] = price
+        
+        # Return last known price for anything the API didn't price
+        for token in tokens:
+            prices.setdefault(token.mint, token.price_usd)
+        
+        return prices
+    
+    def _fetch_price_batch(self, mints):
+        """Price up to 30 mints in one request, using each mint's highest-liquidity pair"""
+        prices = {}
+        try:
+            url = f"https://api.dexscreener.com/latest/dex/tokens/{','.join(mints)}"
+            response = self._get(url, timeout=1)  # Very fast timeout
+            
+            if response is not None and response.status_code == 200:
+                data = json_loads(response.content)
+                wanted = set(mints)
+                best_pairs = {}
+                
+                for pair in data.get('pairs', None) or []:
+                    mint = pair.get('baseToken', {}).get('address')
+                    if mint not in wanted:
+                        continue
+                    
+                    liquidity = _fnum(pair.get('liquidity', {}).get('usd'))
+                    if mint not in best_pairs or liquidity > best_pairs[mint][0]:
+                        best_pairs[mint] = (liquidity, pair)
+                
+                for mint, (_, pair) in best_pairs.items():
+                    price = _fnum(pair.get('priceUsd'))
+                    if price > 0:
+                        prices[mint] = price
+        except:
+            pass
+        
+        return prices
+    
+    def _cache_price(self, mint, fetched_at, price):
+        self.price_cache[mint] = (fetched_at, price)
+        self.price_cache.move_to_end(mint)
+        if len(self.price_cache) > PRICE_CACHE_SIZE:
+            self.price_cache.popitem(last=False)
+    
+    def close(self):
+        """Release the pooled connections and worker threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
 
 # Create alias
 DataFetcher = HighFrequencyDataFetcher
@@ -3,6 +3,8 @@ Micro-Profit High-Frequency Trading Bot - Main Application
 Updated for $50/hour target with fixed P&L calculations
 """
 
+import atexit
+import numpy as np
 import streamlit as st
 import time
 from datetime import datetime
@@ -14,6 +16,7 @@ from data_fetcher import DataFetcher
 from trading_engine import TradingEngine
 from analytics import Analytics
 from ui_components import UIComponents
+from trade_store import TradeStore
 
 # Page configuration
 st.set_page_config(
@@ -25,44 +28,78 @@ st.set_page_config(
 # Initialize session state with micro-profit defaults
 def init_session_state():
     """Initialize all session state variables for micro-profit trading"""
+    # Defaults are only needed on a session's first run; later reruns skip building them
+    if 'session_start_time' in st.session_state:
+        return
+    
+    # Every timestamp default starts from the same single clock read
+    now_ts = time.time()
+    now_dt = datetime.fromtimestamp(now_ts)
     defaults = {
         'equity': 1000.0,
         'starting_equity': 1000.0,
         'trades': [],
+        'trades_version': 0,
+        'trade_store': TradeStore(),
         'active_positions': {},
         'seen_tokens': set(),
         'bot_running': False,
         'turbo_mode': False,
         'debug_info': deque(maxlen=100),
-        'last_update': time.time(),
+        'last_update': now_ts,
         'api_calls_count': 0,
         'tokens_bought': 0,
         'tokens_found': 0,
-        'last_token_check': time.time(),
-        'pnl_history': [0],
-        'time_history': [datetime.now()],
-        'last_price_update': time.time(),
+        'last_token_check': now_ts,
+        'last_comprehensive_scan': 0,
+        'pnl_history': deque([0], maxlen=PNL_HISTORY_LENGTH),
+        'time_history': deque([now_dt], maxlen=PNL_HISTORY_LENGTH),
+        'last_price_update': now_ts,
         'daily_pnl': 0,
         'win_streak': 0,
         'loss_streak': 0,
         'best_trade': 0,
         'worst_trade': 0,
         'trades_per_hour': 0,
-        'last_hour_check': datetime.now(),
+        'last_hour_check': now_dt,
         'micro_profit_target': 50,  # $50/hour target
-        'session_start_time': datetime.now()
+        'session_start_time': now_dt
     }
     
     for key, default_value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = default_value
 
+# The fetcher owns the HTTP session, thread pool and response caches, so build it once per process
+# and release its connections and worker threads when the process exits
+@st.cache_resource
+def get_data_fetcher():
+    fetcher = DataFetcher()
+    atexit.register(fetcher.close)
+    return fetcher
+
+# Analytics and UI helpers keep no state of their own, so one instance serves every session
+@st.cache_resource
+def get_analytics():
+    return Analytics()
+
+@st.cache_resource
+def get_ui_components():
+    return UIComponents()
+
+# The engine carries per-session price history and turbo settings, so it is built once per session instead
+def get_trading_engine():
+    if 'trading_engine' not in st.session_state:
+        st.session_state.trading_engine = TradingEngine()
+        st.session_state.trading_engine.apply_turbo_mode(st.session_state.turbo_mode)
+    return st.session_state.trading_engine
+
 # Initialize components
 init_session_state()
-data_fetcher = DataFetcher()
-trading_engine = TradingEngine()
-analytics = Analytics()
-ui = UIComponents()
+data_fetcher = get_data_fetcher()
+trading_engine = get_trading_engine()
+analytics = get_analytics()
+ui = get_ui_components()
 
 # Main UI
 st.title("Micro-Profit High-Frequency Trading Bot")
@@ -84,10 +121,14 @@ if st.session_state.trades:
         st.metric("Target Gap", f"${50-current_rate:.2f}/hr")
 
 # Performance metrics
-ui.render_performance_metrics()
+ui.render_performance_metrics(analytics)
+
+# Control buttons - a fragment, so a click only reruns the panel unless it changes page-wide state
+@st.fragment
+def control_panel():
+    ui.render_control_buttons(trading_engine)
 
-# Control buttons
-ui.render_control_buttons(trading_engine)
+control_panel()
 
 # Strategy info boxes
 ui.render_strategy_info()
@@ -102,10 +143,10 @@ with st.sidebar:
         st.info(f"""
         **TURBO MICRO MODE:**
         - Position Size: ${BASE_POSITION_SIZE * 1.3:.0f} max
-        - Profit Targets: {TURBO_SETTINGS['TAKE_PROFIT_1']*100:.0f}%, {TURBO_SETTINGS['TAKE_PROFIT_2']*100:.0f}%
-        - Stop Loss: {TURBO_SETTINGS['STOP_LOSS']*100:.1f}%
-        - Scan Interval: {TURBO_SETTINGS['SCAN_INTERVAL']*1000:.0f}ms
-        - Score Threshold: {TURBO_SETTINGS['MIN_TOKEN_SCORE']}
+        - Profit Targets: {TURBO_SETTINGS.TAKE_PROFIT_1*100:.0f}%, {TURBO_SETTINGS.TAKE_PROFIT_2*100:.0f}%
+        - Stop Loss: {TURBO_SETTINGS.STOP_LOSS*100:.1f}%
+        - Scan Interval: {TURBO_SETTINGS.SCAN_INTERVAL*1000:.0f}ms
+        - Score Threshold: {TURBO_SETTINGS.MIN_TOKEN_SCORE}
         """)
     else:
         st.info(f"""
@@ -128,9 +169,9 @@ with st.sidebar:
     
     # P&L accuracy verification
     if st.session_state.trades:
-        recent_trades = st.session_state.trades[-5:]
-        profitable_moves = len([t for t in recent_trades if t.get('percent_change', 0) > 0])
-        profitable_pnl = len([t for t in recent_trades if t.get('pnl', 0) > 0])
+        store = st.session_state.trade_store
+        profitable_moves = np.count_nonzero(store.tail('percent_change', 5) > 0)
+        profitable_pnl = np.count_nonzero(store.tail('pnl', 5) > 0)
         
         st.subheader("P&L Calculation Health")
         if profitable_moves == profitable_pnl:
@@ -149,13 +190,51 @@ with st.sidebar:
     if seen_count > 500:
         st.warning("High seen token count - resets every 10min")
 
-# Active positions
+# Active positions - repriced every cycle, so the table refreshes itself on the price cadence
+# instead of rerunning the page; opening or closing a position still reruns everything
+@st.fragment(run_every=PRICE_UPDATE_INTERVAL if st.session_state.bot_running else None)
+def active_positions_panel():
+    if st.session_state.active_positions:
+        ui.render_active_positions()
+
 if st.session_state.active_positions:
-    ui.render_active_positions()
+    active_positions_panel()
 
 # P&L Chart
 if len(st.session_state.pnl_history) > 1:
-    ui.render_pnl_chart()
+    ui.render_pnl_chart(analytics)
+
+# Main trading loop with micro-profit optimizations
+def run_micro_profit_bot():
+    """Enhanced bot execution loop for micro-profit system"""
+    if st.session_state.bot_running:
+        # Run trading cycle with error handling
+        try:
+            trading_engine.run_trading_cycle(data_fetcher)
+        except Exception as e:
+            ui.log_debug(f"Error in micro-profit cycle: {str(e)[:100]}", "error")
+            time.sleep(1)
+
+# Ultra-fast refresh for micro-profit system: only this fragment reruns on the cycle cadence,
+# and the whole page follows only when a cycle changes what the rest of it shows. While
+# paused there is no timer at all - the next run comes from a user interaction
+@st.fragment(run_every=CYCLE_DELAY if st.session_state.bot_running else None)
+def live_trading_panel():
+    was_running = st.session_state.bot_running
+    trades_version = st.session_state.trades_version
+    open_mints = set(st.session_state.active_positions)
+    
+    run_micro_profit_bot()
+    
+    # New trades, opened/closed positions or a loss-limit stop; repricing only refreshes the positions panel
+    if (
+        st.session_state.trades_version != trades_version or
+        st.session_state.active_positions.keys() != open_mints or
+        was_running != st.session_state.bot_running
+    ):
+        st.rerun()
+    
+    ui.render_live_activity()
 
 # Trading tabs
 tab1, tab2, tab3, tab4 = st.tabs([
@@ -166,13 +245,13 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 with tab1:
-    ui.render_live_activity()
+    live_trading_panel()
 
 with tab2:
     ui.render_trade_history()
 
 with tab3:
-    ui.render_statistics()
+    ui.render_statistics(analytics)
 
 with tab4:
     ui.render_analysis_export(analytics)
@@ -183,54 +262,23 @@ if st.session_state.trades:
     
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     
-    total_pnl = sum(t['pnl'] for t in st.session_state.trades)
-    avg_pnl = total_pnl / len(st.session_state.trades) if st.session_state.trades else 0
-    
-    winning_trades = [t for t in st.session_state.trades if t['pnl'] > 0]
-    losing_trades = [t for t in st.session_state.trades if t['pnl'] < 0]
-    
-    avg_win = sum(t['pnl'] for t in winning_trades) / len(winning_trades) if winning_trades else 0
-    avg_loss = sum(t['pnl'] for t in losing_trades) / len(losing_trades) if losing_trades else 0
-    
-    # Micro-profit specific metrics
-    micro_profits = [t for t in st.session_state.trades if 0 < t['pnl'] < 1]
-    quick_trades = [t for t in st.session_state.trades if t.get('duration_seconds', 0) < 180]
+    # Aggregates come from the columnar trade store, reduced once per new trade
+    metrics = analytics.get_performance_metrics()
     
     with col1:
-        st.metric("Total P&L", f"${total_pnl:.2f}")
+        st.metric("Total P&L", f"${metrics['total_pnl']:.2f}")
     with col2:
-        st.metric("Avg Trade", f"${avg_pnl:.3f}")
+        st.metric("Avg Trade", f"${metrics['avg_pnl']:.3f}")
     with col3:
-        st.metric("Micro-Profits", len(micro_profits))
+        st.metric("Micro-Profits", metrics['micro_profits'])
     with col4:
-        st.metric("Quick Trades (<3min)", len(quick_trades))
+        st.metric("Quick Trades (<3min)", metrics['quick_trades'])
     with col5:
-        st.metric("Avg Win", f"${avg_win:.3f}")
+        st.metric("Avg Win", f"${metrics['avg_win']:.3f}")
     with col6:
-        st.metric("Avg Loss", f"${avg_loss:.3f}")
-
-# Main trading loop with micro-profit optimizations
-def run_micro_profit_bot():
-    """Enhanced bot execution loop for micro-profit system"""
-    if st.session_state.bot_running:
-        # Run trading cycle with error handling
-        try:
-            trading_engine.run_trading_cycle(data_fetcher)
-        except Exception as e:
-            ui.log_debug(f"Error in micro-profit cycle: {str(e)[:100]}", "error")
-            time.sleep(1)
-        
-        # Ultra-fast refresh for micro-profit system
-        time.sleep(CYCLE_DELAY)
-        st.rerun()
-    else:
-        # Slower refresh when not trading
-        time.sleep(2)
-
-# Execute micro-profit bot
-run_micro_profit_bot()
+        st.metric("Avg Loss", f"${metrics['avg_loss']:.3f}")
 
-# Enhanced footer
+# Enhanced footer - each column is one static caption block rather than a caption per line
 st.markdown("---")
 st.markdown("### MICRO-PROFIT TRADING SYSTEM - OPTIMIZED FOR $50/HOUR")
 
@@ -238,30 +286,37 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown("**SYSTEM IMPROVEMENTS:**")
-    st.caption("- Fixed P&L calculations (profit trades now show as profits)")
-    st.caption("- Micro-profit targets: 3% and 5% with 2.5% stop loss")
-    st.caption("- Ultra-fast cycles: 100ms with 500ms scanning")
-    st.caption("- Seen token reset every 10 minutes for re-trading")
+    st.caption(
+        "- Fixed P&L calculations (profit trades now show as profits)\n"
+        "- Micro-profit targets: 3% and 5% with 2.5% stop loss\n"
+        "- Ultra-fast cycles: 100ms with 500ms scanning\n"
+        "- Seen token reset every 10 minutes for re-trading"
+    )
 
 with col2:
     st.markdown("**SOLANA OPTIMIZED:**")
-    st.caption("- Transaction fees: ~$0.05 per trade (vs $0.25)")
-    st.caption("- Position sizes: $12-20 for high frequency")
-    st.caption("- Slippage: 0.2% (tighter than 0.5%)")
-    st.caption("- Max hold time: 3 minutes for quick turnover")
+    st.caption(
+        "- Transaction fees: ~$0.05 per trade (vs $0.25)\n"
+        "- Position sizes: $12-20 for high frequency\n"
+        "- Slippage: 0.2% (tighter than 0.5%)\n"
+        "- Max hold time: 3 minutes for quick turnover"
+    )
 
 with col3:
     st.markdown("**TARGET METRICS:**")
-    st.caption("- 150 trades/hour target frequency")
-    st.caption("- $0.33 average profit per trade")
-    st.caption("- Score threshold: 25 (vs 50 previously)")
-    st.caption("- Market cap range: $5k-$5M (expanded)")
+    st.caption(
+        "- 150 trades/hour target frequency\n"
+        "- $0.33 average profit per trade\n"
+        "- Score threshold: 25 (vs 50 previously)\n"
+        "- Market cap range: $5k-$5M (expanded)"
+    )
 
 # Performance warning if needed
 if st.session_state.trades and len(st.session_state.trades) >= 10:
-    recent_trades = st.session_state.trades[-10:]
-    positive_changes = len([t for t in recent_trades if t.get('percent_change', 0) > 0])
-    positive_pnl = len([t for t in recent_trades if t.get('pnl', 0) > 0])
+    # Compare the last 10 rows of the store's price-move and P&L columns directly
+    store = st.session_state.trade_store
+    positive_changes = np.count_nonzero(store.tail('percent_change', 10) > 0)
+    positive_pnl = np.count_nonzero(store.tail('pnl', 10) > 0)
     
     if positive_changes > positive_pnl + 2:  # Allow some tolerance
         st.error(f"P&L CALCULATION WARNING: {positive_changes} positive price moves but only {positive_pnl} profitable P&L results. Check calculation accuracy.")
@@ -0,0 +1,76 @@
+"""
+Columnar trade store - keeps closed trades as typed NumPy columns for fast analytics
+"""
+
+import numpy as np
+import pandas as pd
+
+# Trade record fields in export order, with the column dtype used to store each one.
+# Display-only USD amounts, percentages and scores fit comfortably in 32 bits; token prices
+# keep float64 since micro-cap prices can be many orders of magnitude below $1, and P&L and
+# price-move columns keep float64 because win/loss and micro-profit checks compare them
+# against cutoffs where rounding to float32 could flip the result.
+TRADE_COLUMNS = (
+    ('timestamp', 'datetime64[us]'),
+    ('symbol', object),
+    ('mint_address', object),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('exit_reason', object),
+    ('pnl', 'f8'),
+    ('pnl_percent', 'f8'),
+    ('duration_seconds', 'f4'),
+    ('duration_minutes', 'f4'),
+    ('percent_change', 'f8'),
+    ('position_size', 'f4'),
+    ('partial_sold', bool),
+    ('source', object),
+    ('score', 'i4'),
+    ('market_cap', 'f4'),
+    ('liquidity', 'f4'),
+    ('volume_24h', 'f4'),
+    ('price_change_5m_at_entry', 'f4'),
+    ('price_change_1h_at_entry', 'f4'),
+    ('price_change_24h_at_entry', 'f4'),
+    ('txns_24h', 'i4'),
+    ('dex', object),
+    ('highest_price_reached', 'f8'),
+    ('max_profit_potential', 'f4'),
+    ('turbo_mode', bool),
+    ('hour_of_day', 'i1'),
+    ('day_of_week', 'i1'),
+    ('is_quick_scalp', bool),
+)
+
+class TradeStore:
+    def __init__(self, capacity=256):
+        self.size = 0
+        self.cols = {name: np.empty(capacity, dtype=dtype) for name, dtype in TRADE_COLUMNS}
+    
+    def __len__(self):
+        return self.size
+    
+    def append(self, trade):
+        """Write one trade record into the next free row, doubling capacity when full"""
+        if self.size == len(self.cols['pnl']):
+            self._grow()
+        
+        row = self.size
+        for name, col in self.cols.items():
+            col[row] = trade.get(name, None if col.dtype == object else 0)
+        self.size += 1
+    
+    def _grow(self):
+        for name, col in self.cols.items():
+            grown = np.empty(len(col) * 2, dtype=col.dtype)
+            grown[:self.size] = col[:self.size]
+            self.cols[name] = grown
+    
+    def tail(self, name, count):
+        """View of the last `count` filled rows of one column"""
+        return self.cols[name][max(self.size - count, 0):self.size]
+    
+    def to_frame(self):
+        """Wrap the filled part of each column in a DataFrame without per-row work"""
+        n = self.size
+        return pd.DataFrame({name: col[:n] for name, col in self.cols.items()}, copy=False)
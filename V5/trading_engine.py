@@ -4,25 +4,26 @@ Micro-Profit Trading Engine - COMPLETELY FIXED P&L calculations for high-frequen
 
 import streamlit as st
 import time
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from config import *
 
 class MicroProfitTradingEngine:
     def __init__(self):
-        self.config = NORMAL_SETTINGS.copy()
+        self.config = NORMAL_SETTINGS
         self.price_history = {}
         self.seen_tokens_reset_time = time.time()
         
     def apply_turbo_mode(self, enabled):
         """Apply turbo mode settings"""
         if enabled:
-            self.config = TURBO_SETTINGS.copy()
+            self.config = TURBO_SETTINGS
             # Update global settings
-            for key, value in TURBO_SETTINGS.items():
+            for key, value in asdict(TURBO_SETTINGS).items():
                 if hasattr(st.session_state, f'config_{key.lower()}'):
                     setattr(st.session_state, f'config_{key.lower()}', value)
         else:
-            self.config = NORMAL_SETTINGS.copy()
+            self.config = NORMAL_SETTINGS
     
     def reset_seen_tokens_periodically(self):
         """Reset seen tokens every 10 minutes for re-trading opportunities"""
@@ -38,7 +39,7 @@ class MicroProfitTradingEngine:
     
     def should_buy_token(self, token):
         """Extremely permissive token selection for high frequency"""
-        mint = token.get('mint', '')
+        mint = token.mint
         
         # Skip if currently owned (but allow re-trading after reset)
         if mint in st.session_state.active_positions:
@@ -49,28 +50,28 @@ class MicroProfitTradingEngine:
             return False
         
         # Very low score threshold
-        score = token.get('score', 0)
-        min_score = self.config.get('MIN_TOKEN_SCORE', MIN_TOKEN_SCORE)
+        score = token.score
+        min_score = self.config.MIN_TOKEN_SCORE
         if score < min_score:
             return False
         
         # Extremely permissive momentum - accept tiny movements
-        price_change_1h = token.get('price_change_1h', 0)
-        price_change_5m = token.get('price_change_5m', 0)
+        price_change_1h = token.price_change_1h
+        price_change_5m = token.price_change_5m
         
-        min_increase = self.config.get('MIN_PRICE_INCREASE', MIN_PRICE_INCREASE) * 100
+        min_increase = self.config.MIN_PRICE_INCREASE * 100
         
         # Accept if ANY timeframe shows momentum or even small negative
         if price_change_1h < -10 and price_change_5m < -5:  # Only reject extreme negatives
             return False
         
         # Very permissive market cap range
-        market_cap = token.get('market_cap', 0)
+        market_cap = token.market_cap
         if not (MIN_MARKET_CAP <= market_cap <= MAX_MARKET_CAP):
             return False
         
         # Low liquidity requirement
-        liquidity = token.get('liquidity', 0)
+        liquidity = token.liquidity
         if liquidity < MIN_LIQUIDITY:
             return False
         
@@ -80,7 +81,7 @@ class MicroProfitTradingEngine:
     
     def calculate_position_size(self, token):
         """Small, consistent position sizes for high frequency"""
-        score = token.get('score', 0)
+        score = token.score
         
         # Keep positions small and consistent
         if score >= 50:
@@ -93,12 +94,12 @@ class MicroProfitTradingEngine:
     def enter_position(self, token):
         """Enter position with CORRECT P&L tracking from start"""
         try:
-            base_price = token.get('price_usd', 0)
+            base_price = token.price_usd
             if base_price <= 0:
                 return None
             
             position_size = self.calculate_position_size(token)
-            mint = token.get('mint', '')
+            mint = token.mint
             
             # STEP 1: Calculate entry with slippage and fees
             entry_price_with_slippage = base_price * (1 + SLIPPAGE)  # Pay 0.2% more
@@ -115,15 +116,15 @@ class MicroProfitTradingEngine:
                 'position_size': position_size,  # Original investment
                 'net_investment': net_investment,  # After entry fee
                 'tokens_bought': tokens_bought,  # Actual tokens owned
-                'take_profit_1': base_price * (1 + self.config.get('TAKE_PROFIT_1', TAKE_PROFIT_1)),
-                'take_profit_2': base_price * (1 + self.config.get('TAKE_PROFIT_2', TAKE_PROFIT_2)),
-                'stop_loss': base_price * (1 - self.config.get('STOP_LOSS', STOP_LOSS)),
+                'take_profit_1': base_price * (1 + self.config.TAKE_PROFIT_1),
+                'take_profit_2': base_price * (1 + self.config.TAKE_PROFIT_2),
+                'stop_loss': base_price * (1 - self.config.STOP_LOSS),
                 'highest_price': base_price,
                 'partial_sold': False,
                 'partial_tokens_sold': 0,
                 'partial_proceeds': 0,
                 'consecutive_no_change': 0,
-                'score': token.get('score', 0)
+                'score': token.score
             }
             
             # Initialize price history
@@ -170,7 +171,7 @@ class MicroProfitTradingEngine:
     
     def check_exit_conditions(self, position, current_price):
         """Fast exit conditions for micro-profits"""
-        mint = position['token'].get('mint', '')
+        mint = position['token'].mint
         position['current_price'] = current_price
         
         # Update price history for stagnation detection
@@ -194,7 +195,7 @@ class MicroProfitTradingEngine:
         time_held = (datetime.now() - position['entry_time']).total_seconds()
         
         # PARTIAL PROFIT TAKING at 3%
-        profit_target_1 = self.config.get('TAKE_PROFIT_1', TAKE_PROFIT_1)
+        profit_target_1 = self.config.TAKE_PROFIT_1
         if not position.get('partial_sold', False) and percent_change >= (profit_target_1 * 100):
             # Sell 50% of tokens
             tokens_to_sell = position['tokens_bought'] * 0.5
@@ -218,7 +219,7 @@ class MicroProfitTradingEngine:
             return False, 'PARTIAL_3%', partial_pnl
         
         # NO-CHANGE DETECTION (ultra-fast)
-        no_change_time = self.config.get('NO_CHANGE_SELL_TIME', NO_CHANGE_SELL_TIME)
+        no_change_time = self.config.NO_CHANGE_SELL_TIME
         if mint in self.price_history:
             recent_prices = self.price_history[mint]['prices'][-3:]
             if len(recent_prices) >= 3:
@@ -233,12 +234,12 @@ class MicroProfitTradingEngine:
                     position['consecutive_no_change'] = 0
         
         # PROFIT TARGETS (micro-profits)
-        profit_target_2 = self.config.get('TAKE_PROFIT_2', TAKE_PROFIT_2)
+        profit_target_2 = self.config.TAKE_PROFIT_2
         if percent_change >= (profit_target_2 * 100):  # 5% target
             return True, 'TAKE_PROFIT_5%', pnl
         
         # TIGHT STOP LOSS
-        stop_loss_pct = self.config.get('STOP_LOSS', STOP_LOSS)
+        stop_loss_pct = self.config.STOP_LOSS
         if percent_change <= -(stop_loss_pct * 100):  # 2.5% stop loss
             return True, 'STOP_LOSS_2.5%', pnl
         
@@ -266,6 +267,8 @@ class MicroProfitTradingEngine:
         # Record trade with correct values
         trade = self._create_trade_record(position, reason, actual_pnl)
         st.session_state.trades.append(trade)
+        st.session_state.trade_store.append(trade)
+        st.session_state.trades_version += 1
         
         # Update equity correctly
         remaining_tokens = position['tokens_bought'] - position.get('partial_tokens_sold', 0)
@@ -293,9 +296,10 @@ class MicroProfitTradingEngine:
             if actual_pnl < st.session_state.worst_trade:
                 st.session_state.worst_trade = actual_pnl
         
-        # Track P&L history
-        current_total_pnl = sum(t['pnl'] for t in st.session_state.trades)
-        st.session_state.pnl_history.append(current_total_pnl)
+        # Track P&L history - a running total, so each close costs O(1) rather than a sum over every trade
+        pnl_history = st.session_state.pnl_history
+        current_total_pnl = (pnl_history[-1] if pnl_history else 0) + actual_pnl
+        pnl_history.append(current_total_pnl)
         st.session_state.time_history.append(datetime.now())
         
         # Clean up
@@ -313,8 +317,8 @@ class MicroProfitTradingEngine:
         
         return {
             'timestamp': datetime.now(),
-            'symbol': position['token']['symbol'],
-            'mint_address': position['token'].get('mint', ''),
+            'symbol': position['token'].symbol,
+            'mint_address': position['token'].mint,
             'entry_price': base_price,  # Use base price for consistency
             'exit_price': current_price,
             'exit_reason': reason,
@@ -325,16 +329,16 @@ class MicroProfitTradingEngine:
             'percent_change': percent_change,
             'position_size': position['position_size'],
             'partial_sold': position.get('partial_sold', False),
-            'source': position['token'].get('source', 'Unknown'),
+            'source': position['token'].source,
             'score': position.get('score', 0),
-            'market_cap': position['token'].get('market_cap', 0),
-            'liquidity': position['token'].get('liquidity', 0),
-            'volume_24h': position['token'].get('volume_24h', 0),
-            'price_change_5m_at_entry': position['token'].get('price_change_5m', 0),
-            'price_change_1h_at_entry': position['token'].get('price_change_1h', 0),
-            'price_change_24h_at_entry': position['token'].get('price_change_24h', 0),
-            'txns_24h': position['token'].get('txns_24h', 0),
-            'dex': position['token'].get('dex', 'unknown'),
+            'market_cap': position['token'].market_cap,
+            'liquidity': position['token'].liquidity,
+            'volume_24h': position['token'].volume_24h,
+            'price_change_5m_at_entry': position['token'].price_change_5m,
+            'price_change_1h_at_entry': position['token'].price_change_1h,
+            'price_change_24h_at_entry': position['token'].price_change_24h,
+            'txns_24h': position['token'].txns_24h,
+            'dex': position['token'].dex,
             'highest_price_reached': position.get('highest_price', base_price),
             'max_profit_potential': ((position.get('highest_price', base_price) - base_price) / base_price) * 100,
             'turbo_mode': st.session_state.turbo_mode,
@@ -348,9 +352,14 @@ class MicroProfitTradingEngine:
         if not st.session_state.active_positions:
             return
         
+        # One batched lookup for every open position instead of a request per token
+        prices = data_fetcher.get_current_prices(
+            [position['token'] for position in st.session_state.active_positions.values()]
+        )
+        
         for mint, position in st.session_state.active_positions.items():
             try:
-                new_price = data_fetcher.get_current_price(position['token'])
+                new_price = prices.get(position['token'].mint, 0)
                 if new_price > 0:
                     # Accept reasonable price movements
                     current_price = position.get('current_price', position['base_price'])
@@ -408,19 +417,35 @@ class MicroProfitTradingEngine:
                 continue
         
         # Aggressive token scanning
-        scan_interval = self.config.get('SCAN_INTERVAL', SCAN_INTERVAL)
+        scan_interval = self.config.SCAN_INTERVAL
         if current_time - st.session_state.last_token_check >= scan_interval:
             st.session_state.last_token_check = current_time
             
             if st.session_state.equity >= BASE_POSITION_SIZE:
                 try:
-                    tokens = data_fetcher.fetch_all_tokens()
+                    # The fetcher is shared across sessions, so each session keeps its own deep-scan timer
+                    comprehensive = current_time - st.session_state.last_comprehensive_scan >= COMPREHENSIVE_SCAN_INTERVAL
+                    if comprehensive:
+                        st.session_state.last_comprehensive_scan = current_time
+                    
+                    st.session_state.api_calls_count += 1
+                    tokens = data_fetcher.fetch_all_tokens(st.session_state.turbo_mode, comprehensive)
+                    st.session_state.tokens_found = len(tokens)
                     
                     bought_this_cycle = 0
-                    max_positions = self.config.get('MAX_CONCURRENT_POSITIONS', MAX_CONCURRENT_POSITIONS)
+                    max_positions = self.config.MAX_CONCURRENT_POSITIONS
                     
                     # Take many more tokens per cycle
-                    for token in tokens[:50]:  # Consider top 50
+                    candidates = [t for t in tokens[:50] if t.mint not in st.session_state.active_positions]  # Consider top 50
+                    
+                    # Search responses can be cached for several seconds, so enter at a current price:
+                    # one batched lookup, served from the same short-lived cache that reprices positions
+                    if candidates and len(st.session_state.active_positions) < max_positions:
+                        fresh_prices = data_fetcher.get_current_prices(candidates)
+                        for token in candidates:
+                            token.price_usd = fresh_prices[token.mint]
+                    
+                    for token in candidates:
                         if len(st.session_state.active_positions) >= max_positions:
                             break
                         
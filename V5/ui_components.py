@@ -5,9 +5,16 @@ Updated User interface components for micro-profit high-frequency system
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from html import escape
 from io import StringIO
 from collections import deque
+from itertools import islice
 from config import *
+from trade_store import TradeStore
+
+# Alert-style row backgrounds for the Live Activity feed, keyed by debug message type
+ACTIVITY_COLORS = {"success": "#d4edda", "error": "#f8d7da", "warning": "#fff3cd", "info": "#d1ecf1"}
+ACTIVITY_ROW = '<div style="background:{};color:#212529;padding:6px 12px;margin:2px 0;border-radius:6px">{}</div>'
 
 class UIComponents:
     def log_debug(self, message, msg_type="info"):
@@ -15,7 +22,7 @@ class UIComponents:
         timestamped = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
         st.session_state.debug_info.append((timestamped, msg_type))
     
-    def render_performance_metrics(self):
+    def render_performance_metrics(self, analytics):
         """Render performance metrics for micro-profit trading"""
         col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
         
@@ -39,13 +46,12 @@ class UIComponents:
             st.metric("Daily P&L", f"${st.session_state.daily_pnl:.2f}")
         
         with col4:
-            max_pos = TURBO_SETTINGS['MAX_CONCURRENT_POSITIONS'] if st.session_state.turbo_mode else MAX_CONCURRENT_POSITIONS
+            max_pos = TURBO_SETTINGS.MAX_CONCURRENT_POSITIONS if st.session_state.turbo_mode else MAX_CONCURRENT_POSITIONS
             st.metric("Positions", f"{len(st.session_state.active_positions)}/{max_pos}")
         
         with col5:
-            total_trades = len(st.session_state.trades)
-            wins = len([t for t in st.session_state.trades if t['pnl'] > 0])
-            win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
+            metrics = analytics.get_performance_metrics()
+            win_rate = metrics['win_rate'] if metrics else 0
             st.metric("Win Rate", f"{win_rate:.1f}%")
         
         with col6:
@@ -79,7 +85,8 @@ class UIComponents:
                 st.metric("$/Hour Est", "$0.00")
     
     def render_control_buttons(self, trading_engine):
-        """Updated control buttons for micro-profit system"""
+        """Updated control buttons for micro-profit system - buttons that change what the rest
+        of the page shows rerun the whole app, the rest only their own panel"""
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
@@ -88,6 +95,7 @@ class UIComponents:
                 st.session_state.bot_running = not st.session_state.bot_running
                 if st.session_state.bot_running:
                     self.log_debug("Micro-profit system started - targeting $50/hour", "success")
+                st.rerun()
         
         with col2:
             if st.button("TURBO MICRO" if not st.session_state.turbo_mode else "NORMAL MICRO", 
@@ -100,6 +108,7 @@ class UIComponents:
                     self.log_debug("TURBO MICRO: 300 positions, 2% targets, 300ms scans", "warning")
                 else:
                     self.log_debug("NORMAL MICRO: 200 positions, 3% targets, 500ms scans", "info")
+                st.rerun()
         
         with col3:
             if st.button("RESET BOT", use_container_width=True):
@@ -107,14 +116,16 @@ class UIComponents:
                 st.session_state.equity = 1000.0
                 st.session_state.starting_equity = 1000.0
                 st.session_state.trades = []
+                st.session_state.trade_store = TradeStore()
+                st.session_state.trades_version += 1
                 st.session_state.active_positions = {}
                 st.session_state.seen_tokens = set()
                 st.session_state.debug_info = deque(maxlen=100)
                 st.session_state.api_calls_count = 0
                 st.session_state.tokens_bought = 0
                 st.session_state.tokens_found = 0
-                st.session_state.pnl_history = []
-                st.session_state.time_history = []
+                st.session_state.pnl_history = deque(maxlen=PNL_HISTORY_LENGTH)
+                st.session_state.time_history = deque(maxlen=PNL_HISTORY_LENGTH)
                 st.session_state.daily_pnl = 0
                 st.session_state.win_streak = 0
                 st.session_state.loss_streak = 0
@@ -122,6 +133,7 @@ class UIComponents:
                 st.session_state.worst_trade = 0
                 st.session_state.trades_per_hour = 0
                 self.log_debug("Reset for micro-profit trading", "info")
+                st.rerun()
         
         with col4:
             if st.button("SPEED SCAN", use_container_width=True):
@@ -216,6 +228,7 @@ class UIComponents:
         st.subheader(f"Micro-Positions ({len(st.session_state.active_positions)})")
         
         positions_data = []
+        now = datetime.now()  # One clock read for every position's hold time
         for mint, pos in st.session_state.active_positions.items():
             current_price = pos.get('current_price', pos.get('base_price', 0))
             base_price = pos.get('base_price', pos.get('entry_price', 0))
@@ -243,8 +256,8 @@ class UIComponents:
                 current_pnl = 0
             
             # Progress to micro-profit targets
-            target_1 = TURBO_SETTINGS['TAKE_PROFIT_1'] if st.session_state.turbo_mode else TAKE_PROFIT_1
-            target_2 = TURBO_SETTINGS['TAKE_PROFIT_2'] if st.session_state.turbo_mode else TAKE_PROFIT_2
+            target_1 = TURBO_SETTINGS.TAKE_PROFIT_1 if st.session_state.turbo_mode else TAKE_PROFIT_1
+            target_2 = TURBO_SETTINGS.TAKE_PROFIT_2 if st.session_state.turbo_mode else TAKE_PROFIT_2
             
             tp1_progress = (pnl_percent / (target_1 * 100)) * 100
             tp2_progress = (pnl_percent / (target_2 * 100)) * 100
@@ -264,12 +277,12 @@ class UIComponents:
                 status = f"LOSS {pos.get('score', 0)}"
             
             # Time held
-            time_held = (datetime.now() - pos.get('entry_time', datetime.now())).total_seconds()
+            time_held = (now - pos.get('entry_time', now)).total_seconds()
             time_display = f"{int(time_held)}s" if time_held < 300 else f"{int(time_held/60)}m"
             
             positions_data.append({
                 'Status': status,
-                'Symbol': pos['token']['symbol'],
+                'Symbol': pos['token'].symbol,
                 'Size': f"${position_size:.0f}",
                 'Entry': f"${base_price:.6f}",
                 'Current': f"${current_price:.6f}",
@@ -279,7 +292,7 @@ class UIComponents:
                 'TP2%': f"{tp2_progress:.0f}%",
                 'Time': time_display,
                 'Partial': "Y" if pos.get('partial_sold', False) else "N",
-                'Source': pos['token'].get('source', 'Unknown')
+                'Source': pos['token'].source
             })
         
         if positions_data:
@@ -302,7 +315,7 @@ class UIComponents:
                 micro_profits = len([p for p in positions_data if 0 < float(p['P&L'].replace('$', '')) < 1])
                 st.metric("Micro-Profits", micro_profits)
     
-    def render_pnl_chart(self):
+    def render_pnl_chart(self, analytics):
         """Enhanced P&L chart for micro-profit tracking"""
         st.subheader("Micro-Profit Performance Analytics")
         
@@ -328,8 +341,7 @@ class UIComponents:
             
             # Micro-profit specific metrics
             if st.session_state.trades:
-                micro_trades = [t for t in st.session_state.trades if 0 < t.get('pnl', 0) < 1]
-                st.metric("Micro-Profit Trades", len(micro_trades))
+                st.metric("Micro-Profit Trades", analytics.get_performance_metrics()['micro_profits'])
             
             if st.session_state.win_streak > 0:
                 st.metric("Win Streak", f"{st.session_state.win_streak}")
@@ -349,16 +361,17 @@ class UIComponents:
     def render_live_activity(self):
         """Enhanced live activity for micro-profit system"""
         st.subheader("Micro-Profit Live Activity")
-        if st.session_state.debug_info:
-            for msg, msg_type in list(st.session_state.debug_info)[-30:]:
-                if msg_type == "success":
-                    st.success(msg)
-                elif msg_type == "error":
-                    st.error(msg)
-                elif msg_type == "warning":
-                    st.warning(msg)
-                else:
-                    st.info(msg)
+        debug_info = st.session_state.debug_info
+        if debug_info:
+            # Walk just the newest 30 entries instead of copying the whole deque to slice it, and
+            # send them as one HTML block rather than an alert element per message
+            st.markdown(
+                "".join(
+                    ACTIVITY_ROW.format(ACTIVITY_COLORS.get(msg_type, ACTIVITY_COLORS["info"]), escape(msg))
+                    for msg, msg_type in islice(debug_info, max(len(debug_info) - 30, 0), None)
+                ),
+                unsafe_allow_html=True
+            )
         else:
             st.info("Click START MICRO TRADING to begin high-frequency micro-profit system...")
     
@@ -418,14 +431,12 @@ class UIComponents:
                     total_pnl = sum(t.get('pnl', 0) for t in recent_trades)
                     st.metric("Recent 20 P&L", f"${total_pnl:.2f}")
     
-    def render_statistics(self):
+    def render_statistics(self, analytics):
         """Updated statistics for micro-profit system"""
         if not st.session_state.trades:
             st.info("No trades yet")
             return
         
-        from analytics import Analytics
-        analytics = Analytics()
         metrics = analytics.get_performance_metrics()
         
         if metrics:
@@ -437,8 +448,7 @@ class UIComponents:
                 st.metric("Losing Trades", metrics['losing_trades'])
                 
                 # Micro-profit specific metrics
-                micro_profits = len([t for t in st.session_state.trades if 0 < t.get('pnl', 0) < 1])
-                st.metric("Micro-Profits", micro_profits)
+                st.metric("Micro-Profits", metrics['micro_profits'])
             
             with col2:
                 st.metric("Average Win", f"${metrics['avg_win']:.3f}")
@@ -482,7 +492,7 @@ class UIComponents:
                 )
                 
                 # Micro-profit summary
-                micro_trades = len([t for t in st.session_state.trades if 0 < t.get('pnl', 0) < 1])
+                micro_trades = analytics.get_performance_metrics()['micro_profits']
                 st.info(f"Dataset: {len(df)} trades, {micro_trades} micro-profits")
             else:
                 st.warning("No trades to export yet")